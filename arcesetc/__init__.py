@@ -9,3 +9,7 @@ except ImportError:
 
 from .plots import *
 from .util import *
+from .validation import *
+from .aio import *
+from .results import *
+from .atlas import *
@@ -0,0 +1,109 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from weakref import WeakKeyDictionary
+
+from .util import (signal_to_noise_to_exp_time, reconstruct_order,
+                   exp_time_percentiles)
+
+__all__ = ['BoundedExecutor', 'signal_to_noise_to_exp_time_async',
+           'reconstruct_order_async', 'exp_time_percentiles_async']
+
+
+class BoundedExecutor(object):
+    """
+    Run blocking ``arcesetc`` calls in a thread pool from coroutines.
+
+    At most ``max_pending`` calls are submitted to the pool at once; further
+    coroutines wait for a free slot, so a burst of requests from a scheduler
+    doesn't queue unboundedly many jobs. Every thread shares the template cache
+    in `~arcesetc.util.load_template`, so each template is only read from the
+    archive once.
+
+    Cancelling a coroutine that is waiting for a slot drops its call. A call
+    that is already running in a thread runs to completion, but its result is
+    discarded and its slot is released once it finishes.
+
+    Parameters
+    ----------
+    max_workers : int
+        Number of threads in the pool.
+    max_pending : int or None
+        Maximum number of calls submitted to the pool at once. Defaults to
+        ``max_workers``.
+    """
+    def __init__(self, max_workers=4, max_pending=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._semaphores = WeakKeyDictionary()
+
+    def _semaphore(self):
+        # Semaphores belong to one event loop, so keep one per running loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return self._semaphores[loop]
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Call ``func(*args, **kwargs)`` in the thread pool and return its result.
+        """
+        semaphore = self._semaphore()
+        await semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(partial(func, *args, **kwargs))
+        # Release the slot when the call finishes, even if we're cancelled
+        future.add_done_callback(partial(_release, loop, semaphore))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait=True):
+        """
+        Shut down the thread pool.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+def _release(loop, semaphore, future):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # The event loop has been closed, so nothing is waiting on the slot
+        pass
+
+
+default_executor = BoundedExecutor()
+
+
+async def signal_to_noise_to_exp_time_async(*args, executor=None, **kwargs):
+    """
+    Asynchronous version of `~arcesetc.signal_to_noise_to_exp_time`.
+
+    Takes the same arguments, plus an optional `BoundedExecutor`
+    ``executor`` to run the call in.
+    """
+    executor = executor or default_executor
+    return await executor.run(signal_to_noise_to_exp_time, *args, **kwargs)
+
+
+async def reconstruct_order_async(*args, executor=None, **kwargs):
+    """
+    Asynchronous version of `~arcesetc.reconstruct_order`.
+
+    Takes the same arguments, plus an optional `BoundedExecutor`
+    ``executor`` to run the call in.
+    """
+    executor = executor or default_executor
+    return await executor.run(reconstruct_order, *args, **kwargs)
+
+
+async def exp_time_percentiles_async(*args, executor=None, **kwargs):
+    """
+    Asynchronous version of `~arcesetc.exp_time_percentiles`, for batches of
+    targets.
+
+    Takes the same arguments, plus an optional `BoundedExecutor`
+    ``executor`` to run the call in.
+    """
+    executor = executor or default_executor
+    return await executor.run(exp_time_percentiles, *args, **kwargs)
@@ -0,0 +1,180 @@
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import astropy.units as u
+
+from .util import (archive, available_sptypes, closest_target, load_template,
+                   order_n_pixels)
+
+__all__ = ['generate_atlas']
+
+manifest_name = 'atlas.json'
+
+
+def archive_checksum(path=None, block_size=2**20):
+    """
+    Return the SHA-256 checksum of the archive file.
+
+    Parameters
+    ----------
+    path : str or None
+        Path to the archive. Defaults to the archive bundled with ``arcesetc``.
+    block_size : int
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    checksum : str
+        Hexadecimal digest of the archive.
+    """
+    sha256 = hashlib.sha256()
+    with open(path or archive.filename, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _init_worker():
+    # Render without a display in every worker process
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(sptype, kind, plots, V, exp_time, signal_to_noise, dpi):
+    """
+    Render the plots of one kind for one spectral type, and save them.
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from .plots import plot_order_counts, plot_order_sn
+
+    # Each figure is saved and closed before the next one reuses the buffers
+    target, _ = closest_target(sptype)
+    max_pixels = order_n_pixels(load_template(target)).max()
+    out = (np.empty(max_pixels), np.empty(max_pixels))
+
+    plot = plot_order_sn if kind == 'sn' else plot_order_counts
+    for wavelength, path in plots:
+        fig, ax, _ = plot(sptype, wavelength * u.Angstrom, V,
+                          exp_time=exp_time, signal_to_noise=signal_to_noise,
+                          out=out)
+        fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+    return [path for wavelength, path in plots]
+
+
+def generate_atlas(output_dir, sptypes=None, orders=None,
+                   kinds=('sn', 'counts'), V=10, exp_time=30*u.min, signal_to_noise=None,
+                   file_format='png', dpi=100, max_workers=None):
+    """
+    Render the S/N and counts plots for every spectral type and order in the
+    archive to image files.
+
+    Plots are rendered in parallel processes with the non-interactive Agg
+    backend. The inputs of each plot and the checksum of the archive are
+    recorded in ``atlas.json`` in ``output_dir``, and plots whose inputs
+    haven't changed since the last run are skipped.
+
+    Parameters
+    ----------
+    output_dir : str
+        Directory to save the plots in. Files are named like
+        ``G5V_order042_sn.png``, with characters other than letters, digits,
+        ``.``, ``+`` and ``-`` in the spectral type replaced by ``_``.
+    sptypes : list of str or None
+        Spectral types to render. Defaults to `~arcesetc.available_sptypes`.
+    orders : list of int or None
+        Spectral order indices to render. Defaults to every order.
+    kinds : tuple of str
+        Which plots to render: ``'sn'`` for `~arcesetc.plot_order_sn` and
+        ``'counts'`` for `~arcesetc.plot_order_counts`.
+    V : float
+        V magnitude of the targets.
+    exp_time : None or `~astropy.units.Quantity`
+        Exposure time of each plot, if ``signal_to_noise`` is None.
+    signal_to_noise : None or float
+        If given, plot the exposure time which yields this S/N at the center of
+        each order, instead of using ``exp_time``.
+    file_format : str
+        Image format, passed to `~matplotlib.figure.Figure.savefig`.
+    dpi : float
+        Resolution of the images.
+    max_workers : int or None
+        Number of processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    rendered : list of str
+        Paths to the plots that were rendered.
+    skipped : list of str
+        Paths to the up-to-date plots that were skipped.
+    """
+    if signal_to_noise is not None:
+        exp_time = None
+    if sptypes is None:
+        sptypes = available_sptypes()
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest_path = os.path.join(output_dir, manifest_name)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+    checksum = archive_checksum()
+    settings = dict(V=float(V), dpi=float(dpi),
+                    signal_to_noise=None if signal_to_noise is None else
+                    float(signal_to_noise),
+                    exp_time=None if exp_time is None else
+                    float(exp_time.to(u.s).value))
+
+    tasks = []
+    updates = {}
+    skipped = []
+    for sptype in sptypes:
+        target, _ = closest_target(sptype)
+        matrix = load_template(target)
+        sptype_orders = range(len(matrix)) if orders is None else orders
+        file_sptype = re.sub(r'[^A-Za-z0-9.+-]', '_', sptype)
+        for kind in kinds:
+            plots = []
+            for order in sptype_orders:
+                path = os.path.join(output_dir, '{0}_order{1:03d}_{2}.{3}'
+                                    .format(file_sptype, order, kind,
+                                            file_format))
+                inputs = dict(settings, sptype=sptype, order=order, kind=kind,
+                              archive=checksum)
+                name = os.path.basename(path)
+                if manifest.get(name) == inputs and os.path.exists(path):
+                    skipped.append(path)
+                else:
+                    # Plot the order closest to its own central wavelength
+                    plots.append((float(matrix[order, 0]), path))
+                    updates[name] = inputs
+            if plots:
+                tasks.append((sptype, kind, plots))
+
+    rendered = []
+    if tasks:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_worker) as executor:
+                futures = [executor.submit(_render, sptype, kind, plots, V,
+                                           exp_time, signal_to_noise, dpi)
+                           for sptype, kind, plots in tasks]
+                for future in futures:
+                    paths = future.result()
+                    rendered.extend(paths)
+                    manifest.update({os.path.basename(path):
+                                     updates[os.path.basename(path)]
+                                     for path in paths})
+        finally:
+            # Record the plots that finished, so that an interrupted run
+            # picks up where it left off
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+
+    return rendered, skipped
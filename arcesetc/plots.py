@@ -8,7 +8,8 @@ __all__ = ['plot_order_counts', 'plot_order_sn']
 
 @u.quantity_input(exp_time=u.s, wavelength=u.Angstrom)
 def plot_order_counts(sptype, wavelength, V, exp_time=None,
-                      signal_to_noise=None, **kwargs):
+                      signal_to_noise=None, out=None, dtype=np.float64,
+                      **kwargs):
     """
     Plot the counts as a function of wavelength for the spectral
     order nearest to ``wavelength`` for a star of spectral type ``sptype`` and
@@ -36,6 +37,12 @@ def plot_order_counts(sptype, wavelength, V, exp_time=None,
         to generate the counts curve that has S/N = ``signal_to_noise`` at
         wavelength ``wavelength``. Otherwise, generate counts curve for
         exposure time ``exp_time``.
+    out : None or tuple of `~np.ndarray`
+        Buffers ``(wave, flux)`` to reuse for the spectrum, see
+        `~arcesetc.util.matrix_row_to_spectrum`. The plotted line refers to
+        the buffers, so save or close the figure before reusing them.
+    dtype : `~numpy.dtype`
+        Precision of the reconstructed spectrum, if ``out`` is None.
     kwargs : dict
         All extra keyword arguments will be passed to the plot function.
 
@@ -82,7 +89,9 @@ def plot_order_counts(sptype, wavelength, V, exp_time=None,
                                                              wavelength,
                                                              V,
                                                              exp_time=exp_time,
-                                                             signal_to_noise=signal_to_noise)
+                                                             signal_to_noise=signal_to_noise,
+                                                             out=out,
+                                                             dtype=dtype)
 
     fig, ax = plt.subplots()
 
@@ -99,7 +108,7 @@ def plot_order_counts(sptype, wavelength, V, exp_time=None,
 
 @u.quantity_input(exp_time=u.s, wavelength=u.Angstrom)
 def plot_order_sn(sptype, wavelength, V, exp_time=None, signal_to_noise=None,
-                  **kwargs):
+                  out=None, dtype=np.float64, **kwargs):
     """
     Plot the signal-to-noise ratio as a function of wavelength for the spectral
     order nearest to ``wavelength`` for a star of spectral type ``sptype`` and
@@ -127,6 +136,12 @@ def plot_order_sn(sptype, wavelength, V, exp_time=None, signal_to_noise=None,
         to generate the S/N curve that has S/N = ``signal_to_noise`` at
         wavelength ``wavelength``. Otherwise, generate S/N curve for
         exposure time ``exp_time``.
+    out : None or tuple of `~np.ndarray`
+        Buffers ``(wave, flux)`` to reuse for the spectrum, see
+        `~arcesetc.util.matrix_row_to_spectrum`. The plotted line refers to
+        the buffers, so save or close the figure before reusing them.
+    dtype : `~numpy.dtype`
+        Precision of the reconstructed spectrum, if ``out`` is None.
     kwargs : dict
         All extra keyword arguments will be passed to the plot function.
 
@@ -174,7 +189,9 @@ def plot_order_sn(sptype, wavelength, V, exp_time=None, signal_to_noise=None,
                                                              wavelength,
                                                              V,
                                                              exp_time=exp_time,
-                                                             signal_to_noise=signal_to_noise)
+                                                             signal_to_noise=signal_to_noise,
+                                                             out=out,
+                                                             dtype=dtype)
     sn = flux / np.sqrt(flux)
     ax.set_title('Sp. Type: {0}, Exposure time: {1:.1f}'
                  .format(closest_sptype, exp_time.to(u.min)))
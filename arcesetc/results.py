@@ -0,0 +1,241 @@
+import numpy as np
+import astropy.units as u
+from astropy.table import Table
+
+from .util import (archive, available_sptypes, closest_target, load_template,
+                   scale_flux, matrix_row_to_spectrum, pixel_count_rates)
+
+__all__ = ['OrderResult', 'OrderResults', 'reconstruct_orders']
+
+
+class OrderResult(object):
+    """
+    Compact result of reconstructing one spectral order.
+
+    Only the order index and scalings are stored; the wavelengths and counts
+    are reconstructed from the archive when they're accessed. The result
+    unpacks like the return value of `~arcesetc.reconstruct_order`::
+
+        wave, flux, sptype, exp_time = result
+
+    Parameters
+    ----------
+    sptype : str
+        Closest spectral type available in the archive.
+    order : int
+        Spectral order index in the archive.
+    exp_time : float
+        Exposure time in seconds.
+    counts_scale : float
+        Factor converting the archived count rates into counts, for the V
+        magnitude and exposure time of the request.
+    dtype : `~numpy.dtype`
+        Precision of the reconstructed wavelengths and counts.
+    """
+    __slots__ = ('sptype', 'order', '_exp_time', '_counts_scale', 'dtype')
+
+    def __init__(self, sptype, order, exp_time, counts_scale,
+                 dtype=np.float64):
+        self.sptype = sptype
+        self.order = order
+        self._exp_time = exp_time
+        self._counts_scale = counts_scale
+        self.dtype = dtype
+
+    def __repr__(self):
+        return ('<OrderResult sptype={0} order={1} exp_time={2}>'
+                .format(self.sptype, self.order, self.exp_time))
+
+    def __iter__(self):
+        wave, flux = self.spectrum()
+        return iter((wave, flux, self.sptype, self.exp_time))
+
+    @property
+    def exp_time(self):
+        """
+        Exposure time, as a `~astropy.units.Quantity`.
+        """
+        return self._exp_time * u.s
+
+    def spectrum(self, out=None):
+        """
+        Reconstruct the order.
+
+        Parameters
+        ----------
+        out : None or tuple of `~np.ndarray`
+            Buffers ``(wave, flux)`` to reuse for the spectrum, see
+            `~arcesetc.util.matrix_row_to_spectrum`.
+
+        Returns
+        -------
+        wave : `~astropy.units.Quantity`
+            Wavelengths.
+        flux : `~np.ndarray`
+            Counts at each wavelength.
+        """
+        target, _ = closest_target(self.sptype)
+        wave, flux = matrix_row_to_spectrum(load_template(target), self.order,
+                                            out=out, dtype=self.dtype)
+        flux *= self._counts_scale
+        return wave, flux
+
+    @property
+    def wave(self):
+        """
+        Wavelengths, as a `~astropy.units.Quantity`.
+        """
+        return self.spectrum()[0]
+
+    @property
+    def flux(self):
+        """
+        Counts at each wavelength.
+        """
+        return self.spectrum()[1]
+
+
+class OrderResults(object):
+    """
+    Columnar results of reconstructing many spectral orders.
+
+    Each request takes up one row of a structured array, with columns
+    ``sptype`` (index into `~arcesetc.available_sptypes`), ``order``,
+    ``exp_time`` (in seconds) and ``counts_scale``. Indexing with an integer
+    returns an `OrderResult`.
+
+    Parameters
+    ----------
+    data : `~numpy.ndarray`
+        Structured array of results.
+    dtype : `~numpy.dtype`
+        Precision of the reconstructed wavelengths and counts.
+    """
+    __slots__ = ('data', 'dtype')
+
+    def __init__(self, data, dtype=np.float64):
+        self.data = data
+        self.dtype = dtype
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            row = self.data[index]
+            return OrderResult(available_sptypes()[row['sptype']],
+                               int(row['order']),
+                               float(row['exp_time']),
+                               float(row['counts_scale']), dtype=self.dtype)
+        return OrderResults(self.data[index], dtype=self.dtype)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def sptype(self):
+        """
+        Closest spectral type available in the archive for each request.
+        """
+        return np.array(available_sptypes())[self.data['sptype']]
+
+    @property
+    def order(self):
+        """
+        Spectral order index for each request.
+        """
+        return self.data['order']
+
+    @property
+    def exp_time(self):
+        """
+        Exposure time for each request, as a `~astropy.units.Quantity`.
+        """
+        return self.data['exp_time'] * u.s
+
+    def to_table(self):
+        """
+        Return the results as a `~astropy.table.Table`.
+        """
+        table = Table(self.data)
+        table['sptype'] = self.sptype
+        table['exp_time'].unit = u.s
+        return table
+
+
+@u.quantity_input(exp_time=u.s, wavelength=u.Angstrom)
+def reconstruct_orders(sptype, wavelength, V, exp_time=None,
+                       signal_to_noise=None, dtype=np.float64):
+    """
+    Reconstruct the spectral orders for many requests at once, as in
+    `~arcesetc.reconstruct_order`.
+
+    Either ``exp_time`` or ``signal_to_noise`` should be supplied to the
+    function (but not both). All of the arguments may be arrays with one
+    element per request.
+
+    .. warning ::
+        ``arcesetc`` doesn't know anything about saturation. Ye be warned!
+
+    Parameters
+    ----------
+    sptype : str or list of str
+        Spectral type of each star.
+    wavelength : `~astropy.units.Quantity`
+        Wavelength of interest.
+    V : float or `~np.ndarray`
+        V magnitude of each target.
+    exp_time : None or `~astropy.units.Quantity`
+        Exposure time of each request.
+    signal_to_noise : None or float or `~np.ndarray`
+        Desired signal-to-noise at wavelength ``wavelength`` for each request.
+    dtype : `~numpy.dtype`
+        Precision in which the exposure times and scalings are stored, and of
+        the reconstructed spectra. ``np.float32`` halves the memory.
+
+    Returns
+    -------
+    results : `OrderResults`
+        Results, one row per request.
+    """
+    if (exp_time is None) == (signal_to_noise is None):
+        raise ValueError("Supply either the `exp_time` or the "
+                         "`signal_to_noise` keyword argument.")
+
+    given = exp_time.to(u.s).value if exp_time is not None else signal_to_noise
+    sptype, wavelength, V, given = np.broadcast_arrays(
+        np.asarray(sptype, dtype=object), wavelength.to(u.Angstrom).value,
+        V, given
+    )
+    sptype, wavelength, V, given = (np.ravel(a) for a in
+                                    (sptype, wavelength, V, given))
+
+    data = np.empty(len(sptype), dtype=[('sptype', 'i2'), ('order', 'i2'),
+                                        ('exp_time', dtype),
+                                        ('counts_scale', dtype)])
+
+    unique_sptypes, inverse = np.unique(sptype.astype(str),
+                                        return_inverse=True)
+    for i, unique_sptype in enumerate(unique_sptypes):
+        target, closest_spectral_type = closest_target(unique_sptype)
+        rows = inverse == i
+        matrix = load_template(target)
+
+        orders = np.argmin(np.abs(matrix[:, 0] -
+                                  wavelength[rows, np.newaxis]), axis=1)
+        rate_scale = scale_flux(archive[target], V[rows])
+
+        if signal_to_noise is not None:
+            count_rates, _ = pixel_count_rates(matrix, orders,
+                                               wavelength[rows])
+            exp_times = given[rows]**2 / (count_rates * rate_scale)
+        else:
+            exp_times = given[rows]
+
+        data['sptype'][rows] = available_sptypes().index(closest_spectral_type)
+        data['order'][rows] = orders
+        data['exp_time'][rows] = exp_times
+        data['counts_scale'][rows] = rate_scale * exp_times
+
+    return OrderResults(data, dtype=dtype)
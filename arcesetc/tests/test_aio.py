@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import astropy.units as u
+import numpy as np
+import pytest
+
+from ..aio import (BoundedExecutor, signal_to_noise_to_exp_time_async,
+                   reconstruct_order_async, exp_time_percentiles_async)
+from ..util import (signal_to_noise_to_exp_time, reconstruct_order,
+                    exp_time_percentiles)
+
+
+def test_async_matches_sync():
+    """The async variants return the same results as the blocking calls"""
+    wavelength = 6562 * u.Angstrom
+
+    async def run():
+        return await asyncio.gather(
+            signal_to_noise_to_exp_time_async('M0V', wavelength, 12, 30),
+            reconstruct_order_async('G5V', wavelength, 10,
+                                    exp_time=30 * u.min),
+            exp_time_percentiles_async(['M0V', 'G5V'], wavelength, 12, 30)
+        )
+
+    exp_time, (wave, flux, sptype, _), percentiles = asyncio.run(run())
+
+    assert exp_time == signal_to_noise_to_exp_time('M0V', wavelength, 12, 30)
+    expected_wave, expected_flux, expected_sptype, _ = reconstruct_order(
+        'G5V', wavelength, 10, exp_time=30 * u.min
+    )
+    np.testing.assert_array_equal(wave, expected_wave)
+    np.testing.assert_array_equal(flux, expected_flux)
+    assert sptype == expected_sptype
+    np.testing.assert_array_equal(
+        percentiles, exp_time_percentiles(['M0V', 'G5V'], wavelength, 12, 30)
+    )
+
+
+def test_bounded_executor_backpressure():
+    """No more than ``max_pending`` calls run at once"""
+    executor = BoundedExecutor(max_workers=4, max_pending=2)
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def work():
+        with lock:
+            running.append(1)
+            max_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+
+    async def run():
+        await asyncio.gather(*[executor.run(work) for _ in range(10)])
+
+    asyncio.run(run())
+    executor.shutdown()
+    assert max(max_running) == 2
+
+
+def test_bounded_executor_cancellation():
+    """Cancelled calls release their slot in the executor"""
+    executor = BoundedExecutor(max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    async def run():
+        task = asyncio.ensure_future(executor.run(block))
+        waiting = asyncio.ensure_future(executor.run(lambda: 'done'))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+        return await asyncio.wait_for(waiting, 5)
+
+    assert asyncio.run(run()) == 'done'
+    executor.shutdown()
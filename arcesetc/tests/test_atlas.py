@@ -0,0 +1,32 @@
+import os
+import json
+
+from ..atlas import generate_atlas, manifest_name
+
+
+def test_generate_atlas(tmpdir):
+    """Plots are rendered once, and again only when their inputs change"""
+    output_dir = str(tmpdir)
+    kwargs = dict(sptypes=['G5V', 'A9/F0V'], orders=[30, 60], max_workers=2)
+
+    rendered, skipped = generate_atlas(output_dir, **kwargs)
+    assert len(rendered) == 8
+    assert len(skipped) == 0
+    assert all(os.path.exists(path) for path in rendered)
+    assert os.path.join(output_dir, 'A9_F0V_order030_sn.png') in rendered
+
+    with open(os.path.join(output_dir, manifest_name)) as f:
+        assert len(json.load(f)) == 8
+
+    rendered, skipped = generate_atlas(output_dir, **kwargs)
+    assert len(rendered) == 0
+    assert len(skipped) == 8
+
+    # A deleted plot is rendered again
+    os.remove(os.path.join(output_dir, 'G5V_order060_counts.png'))
+    rendered, skipped = generate_atlas(output_dir, **kwargs)
+    assert rendered == [os.path.join(output_dir, 'G5V_order060_counts.png')]
+
+    # Changing the inputs renders every plot again
+    rendered, skipped = generate_atlas(output_dir, V=12, **kwargs)
+    assert len(rendered) == 8
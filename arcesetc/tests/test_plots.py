@@ -0,0 +1,23 @@
+import astropy.units as u
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from ..plots import plot_order_counts, plot_order_sn
+from ..util import reconstruct_order
+
+
+@pytest.mark.parametrize("plot", [plot_order_counts, plot_order_sn])
+def test_plot_order_out(plot):
+    """Plots can reuse buffers for the reconstructed spectrum"""
+    out = (np.empty(2000), np.empty(2000))
+    fig, ax, exp_time = plot('G5V', 6562 * u.Angstrom, 10,
+                             exp_time=30 * u.min, out=out)
+    wave, flux, sptype, expected_exp_time = reconstruct_order(
+        'G5V', 6562 * u.Angstrom, 10, exp_time=30 * u.min
+    )
+    line = ax.get_lines()[0]
+    np.testing.assert_allclose(line.get_xdata(), wave)
+    np.testing.assert_allclose(out[0][:len(wave)], wave.value)
+    assert exp_time == expected_exp_time
+    plt.close(fig)
@@ -0,0 +1,63 @@
+import astropy.units as u
+import numpy as np
+import pytest
+
+from ..results import OrderResult, OrderResults, reconstruct_orders
+from ..util import reconstruct_order
+
+sptypes = ['M0V', 'G4V', 'B3V', 'M0V']
+wavelengths = [6562, 5000, 3990, 4500] * u.Angstrom
+V = [12, 10, 5, 11]
+
+
+@pytest.mark.parametrize("kwargs", [dict(exp_time=[10, 20, 30, 40] * u.min),
+                                    dict(signal_to_noise=[30, 50, 100, 30])])
+def test_reconstruct_orders(kwargs):
+    """Batch results agree with reconstructing each order separately"""
+    results = reconstruct_orders(sptypes, wavelengths, V, **kwargs)
+    assert isinstance(results, OrderResults)
+    assert len(results) == len(sptypes)
+
+    for i, result in enumerate(results):
+        single_kwargs = {key: value[i] for key, value in kwargs.items()}
+        expected = reconstruct_order(sptypes[i], wavelengths[i], V[i],
+                                     **single_kwargs)
+        wave, flux, sptype, exp_time = result
+
+        np.testing.assert_allclose(wave, expected[0])
+        np.testing.assert_allclose(flux, expected[1], rtol=1e-6)
+        assert sptype == expected[2]
+        assert np.abs(exp_time / expected[3] - 1) < 1e-6
+
+    table = results.to_table()
+    assert table['exp_time'].unit == u.s
+    np.testing.assert_array_equal(table['sptype'], results.sptype)
+
+
+def test_order_results_float32():
+    """Single precision results are compact and close to double precision"""
+    results = reconstruct_orders(sptypes, wavelengths, V, signal_to_noise=30)
+    results_32 = reconstruct_orders(sptypes, wavelengths, V,
+                                    signal_to_noise=30, dtype=np.float32)
+
+    assert results_32.data.nbytes < results.data.nbytes
+    assert results_32[0].flux.dtype == np.float32
+    np.testing.assert_allclose(results_32.exp_time, results.exp_time,
+                               rtol=1e-6)
+    assert isinstance(results_32[1:], OrderResults)
+    assert len(results_32[1:]) == len(sptypes) - 1
+
+
+def test_order_result_slots():
+    """Scalar results don't carry an instance dictionary"""
+    result = reconstruct_orders('M0V', 6562 * u.Angstrom, 12,
+                                signal_to_noise=30)[0]
+    assert isinstance(result, OrderResult)
+    assert not hasattr(result, '__dict__')
+    assert result.exp_time.unit == u.s
+    assert result.wave.unit == u.Angstrom
+
+
+def test_reconstruct_orders_arguments():
+    with pytest.raises(ValueError):
+        reconstruct_orders('M0V', 6562 * u.Angstrom, 12)
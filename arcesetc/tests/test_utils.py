@@ -4,15 +4,18 @@ import astropy.units as u
 import numpy as np
 import pytest
 from astropy.io import fits
+from astropy.uncertainty import Distribution
 from specutils import SpectrumCollection
 
 from ..util import (reconstruct_order, closest_sptype, archive, scale_flux,
-                    signal_to_noise_to_exp_time)
+                    signal_to_noise_to_exp_time, matrix_row_to_spectrum,
+                    order_n_pixels, exp_time_percentiles, line_list_exp_time,
+                    closest_target, sn_to_exp_time)
 
 path = os.path.dirname(__file__)
 
 
-@pytest.mark.parametrize("order,", [30, 35, 41, 60, 65, 70, 75, 80, 90])
+@pytest.mark.parametrize("order", [30, 35, 41, 60, 65, 70, 75, 80, 90])
 def test_reconstruct_order_B3V(order):
     """
     End-to-end functional test on several well-behaved orders of an early-type
@@ -110,3 +113,128 @@ def test_sn_to_exptime():
     exp_time = signal_to_noise_to_exp_time(sptype, wavelength, V,
                                            signal_to_noise)
     assert np.abs(exp_time.to(u.s).value - 642.11444) < 1e-2
+
+
+def test_matrix_row_to_spectrum():
+    """
+    Check that the wavelength grid has exactly ``n_lam`` samples and that the
+    fluxes match the archived polynomial.
+    """
+    matrix = archive['HR5191'][:]
+    n_pixels = order_n_pixels(matrix)
+
+    for order in range(len(matrix)):
+        wave, flux = matrix_row_to_spectrum(matrix, order)
+        lam_0, delta_lam = matrix[order][:2]
+        assert len(wave) == len(flux) == n_pixels[order]
+        np.testing.assert_allclose(np.diff(wave.value), delta_lam, rtol=1e-4)
+        np.testing.assert_allclose(flux, np.polyval(matrix[order][3:],
+                                                    wave.value - lam_0))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_matrix_row_to_spectrum_out(dtype):
+    """
+    Check that the spectrum is written into reusable buffers.
+    """
+    matrix = archive['HR5191'][:]
+    buffers = (np.empty(order_n_pixels(matrix).max(), dtype=dtype),
+               np.empty(order_n_pixels(matrix).max(), dtype=dtype))
+
+    for order in [30, 60, 90]:
+        wave, flux = matrix_row_to_spectrum(matrix, order, out=buffers)
+        assert np.shares_memory(wave, buffers[0])
+        assert np.shares_memory(flux, buffers[1])
+        assert wave.dtype == flux.dtype == dtype
+
+        expected_wave, expected_flux = matrix_row_to_spectrum(matrix, order)
+        np.testing.assert_allclose(wave, expected_wave)
+        # Single precision loses accuracy in the faint wings of the order
+        np.testing.assert_allclose(flux, expected_flux, rtol=1e-3,
+                                   atol=1e-3 * expected_flux.max())
+
+    with pytest.raises(ValueError):
+        matrix_row_to_spectrum(matrix, 30, out=(buffers[0][:10],
+                                                buffers[1][:10]))
+
+
+def test_exp_time_percentiles():
+    """
+    Check that the exposure time percentiles agree with the point estimate,
+    for one target or a batch of targets.
+    """
+    wavelength = 6562 * u.Angstrom
+    exp_time = signal_to_noise_to_exp_time('M0V', wavelength, 12, 30)
+
+    # Without uncertainties, every percentile is the point estimate
+    np.testing.assert_allclose(exp_time_percentiles('M0V', wavelength, 12, 30),
+                               exp_time * np.ones(3), rtol=1e-6)
+
+    rng = np.random.default_rng(42)
+    V = Distribution(rng.normal(12, 0.1, size=10000))
+    throughput = Distribution(rng.normal(1, 0.05, size=10000))
+    lower, median, upper = exp_time_percentiles('M0V', wavelength, V, 30,
+                                                throughput)
+    assert lower < median < upper
+    assert np.abs(median / exp_time - 1) < 0.02
+
+    sptypes = ['M0V', 'G5V', 'B3V']
+    wavelengths = [6562, 5000, 4000] * u.Angstrom
+    V = rng.normal(12, 0.1, size=(len(sptypes), 1000))
+    exp_times = exp_time_percentiles(sptypes, wavelengths, V, 30,
+                                     percentiles=[50])
+    assert exp_times.shape == (len(sptypes), 1)
+    for sptype, wavelength, exp_time in zip(sptypes, wavelengths, exp_times):
+        expected = signal_to_noise_to_exp_time(sptype, wavelength, 12, 30)
+        assert np.abs(exp_time[0] / expected - 1) < 0.02
+
+
+def test_exp_time_percentiles_per_target():
+    """
+    Check that one V magnitude per target isn't mistaken for samples.
+    """
+    sptypes = ['M0V', 'G5V']
+    wavelengths = [6562, 5000] * u.Angstrom
+    V = np.array([12., 14.])
+    exp_times = exp_time_percentiles(sptypes, wavelengths, V, 30,
+                                     percentiles=[50])
+    for sptype, wavelength, V_target, exp_time in zip(sptypes, wavelengths,
+                                                       V, exp_times):
+        expected = signal_to_noise_to_exp_time(sptype, wavelength, V_target, 30)
+        np.testing.assert_allclose(exp_time[0], expected, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        exp_time_percentiles(sptypes, wavelengths, np.ones((3, 100)), 30)
+
+
+def test_line_list_exp_time():
+    """
+    Check that each line is measured in the covering order with the highest
+    count rate, and that the longest exposure time governs.
+    """
+    sptype = 'M0V'
+    V = 12
+    signal_to_noise = np.array([30, 50, 50, 100])
+    wavelengths = [6562.8, 5889.95, 5895.92, 4861.3] * u.Angstrom
+    exp_time, lines = line_list_exp_time(sptype, wavelengths, V,
+                                         signal_to_noise)
+
+    target, _ = closest_target(sptype)
+    matrix = archive[target][:]
+    for line in lines:
+        expected_exp_times = []
+        for order in range(len(matrix)):
+            wave, flux = matrix_row_to_spectrum(matrix, order)
+            if wave[0] <= line['wavelength'] <= wave[-1]:
+                flux *= scale_flux(archive[target], V)
+                expected_exp_times.append(
+                    sn_to_exp_time(wave, flux, line['wavelength'],
+                                   line['signal_to_noise']).value
+                )
+        np.testing.assert_allclose(line['exp_time'].value,
+                                   min(expected_exp_times), rtol=1e-6)
+
+    assert exp_time == lines['exp_time'].max()
+
+    with pytest.raises(ValueError):
+        line_list_exp_time(sptype, [6562.8, 20000] * u.Angstrom, V, 30)
@@ -0,0 +1,83 @@
+import os
+import warnings
+
+import astropy.units as u
+import numpy as np
+import pytest
+
+from .. import validation
+from ..util import load_template, matrix_row_to_spectrum, order_n_pixels
+from ..validation import validate_orders, bundled_frames, interpolate_orders
+
+path = os.path.dirname(__file__)
+
+# Orders checked one at a time in test_utils.py, with the same tolerances
+well_behaved_orders = {
+    'HR5191.0002.wfrmcpc.fits': ([30, 35, 41, 60, 65, 70, 75, 80, 90], 1e-1),
+    'BD28_4211.0026.wfrmcpc.fits': ([30, 35, 41, 60, 65, 70, 75, 80, 90], 0.05),
+    'HIP107864.0003.wfrmcpc.fits': ([30, 35, 41, 60, 65, 75, 80], 0.2),
+}
+
+
+def test_validate_orders_all_frames():
+    """Every order of every bundled frame gets a row"""
+    table = validate_orders()
+
+    assert set(table['frame']) == set(bundled_frames)
+    for frame in bundled_frames:
+        rows = table[table['frame'] == frame]
+        np.testing.assert_array_equal(rows['order'], np.arange(len(rows)))
+    assert np.all(table['n_pixels'] > 0)
+    assert table.meta['runtime'] > 0
+
+
+@pytest.mark.parametrize("frame", sorted(well_behaved_orders))
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_validate_orders_accuracy(frame, dtype):
+    """
+    Well-behaved orders are reconstructed as accurately as in the
+    order-by-order tests, in double or single precision.
+    """
+    orders, rtol = well_behaved_orders[frame]
+    fits_path = os.path.join(path, os.pardir, 'data', frame)
+
+    table = validate_orders({fits_path: bundled_frames[frame]},
+                            dtype=dtype, atol=500, rtol=rtol)
+    np.testing.assert_array_equal(table['within_tolerance'][orders], 1)
+
+
+def test_interpolate_orders():
+    """Vectorized interpolation agrees with ``np.interp`` on each order"""
+    matrix = load_template('HR5191')
+    orders = [10, 50, 90]
+    n_pixels = order_n_pixels(matrix)[orders]
+    xp = np.zeros((len(orders), n_pixels.max()))
+    fp = np.zeros((len(orders), n_pixels.max()))
+    for i, order in enumerate(orders):
+        matrix_row_to_spectrum(matrix, order, out=(xp[i], fp[i]))
+
+    x = xp[:, :n_pixels.min()] + 0.3 * matrix[orders, 1:2]
+    f, in_order = interpolate_orders(x, xp, fp, n_pixels)
+    for i in range(len(orders)):
+        np.testing.assert_allclose(f[i][in_order[i]],
+                                   np.interp(x[i], xp[i, :n_pixels[i]],
+                                             fp[i, :n_pixels[i]])[in_order[i]])
+    assert not np.all(in_order)
+
+
+def test_validate_orders_no_overlap(monkeypatch):
+    """Orders outside of every reconstructed order get NaN statistics"""
+    frame = 'HR5191.0002.wfrmcpc.fits'
+    fits_path = os.path.join(path, os.pardir, 'data', frame)
+    wave, flux, exp_time = validation.read_frame(fits_path)
+    wave[0] += 20000 * u.Angstrom
+    monkeypatch.setattr(validation, 'read_frame',
+                        lambda path: (wave, flux, exp_time))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        table = validate_orders({fits_path: bundled_frames[frame]})
+    assert table['n_pixels'][0] == 0
+    assert np.isnan(table['within_tolerance'][0])
+    assert np.isnan(table['median_abs_residual'][0])
+    assert np.all(table['n_pixels'][1:] > 0)
@@ -1,12 +1,14 @@
 from json import load
 from difflib import get_close_matches
+from functools import lru_cache
+from threading import Lock
 import os
 import numpy as np
 import h5py
 import astropy.units as u
 
 __all__ = ['available_sptypes', 'signal_to_noise_to_exp_time',
-           'reconstruct_order']
+           'reconstruct_order', 'exp_time_percentiles', 'line_list_exp_time']
 
 directory = os.path.dirname(__file__)
 
@@ -19,6 +21,9 @@ spectral_types = [key for key in sptype_to_temp.keys() if key in sptypes]
 temps = np.array([sptype_to_temp[key] for key in spectral_types
                   if key in sptype_to_temp])
 
+templates = {}
+templates_lock = Lock()
+
 
 def closest_sptype(sptype):
     """
@@ -81,6 +86,31 @@ def available_sptypes():
     return sorted(sptypes.keys())
 
 
+def load_template(target):
+    """
+    Return the matrix of blaze function curves for ``target`` from the archive.
+
+    Each matrix is read from the archive once and cached; the lock makes the
+    cache safe to share between threads.
+
+    Parameters
+    ----------
+    target : str
+        Name of the target in the archive.
+
+    Returns
+    -------
+    matrix : `~np.ndarray`
+        Read-only matrix of blaze function curves from the archive.
+    """
+    with templates_lock:
+        if target not in templates:
+            matrix = archive[target][:]
+            matrix.flags.writeable = False
+            templates[target] = matrix
+        return templates[target]
+
+
 def get_closest_order(matrix, wavelength):
     """
     Return the spectral order index closest to wavelength ``wavelength``.
@@ -100,7 +130,37 @@ def get_closest_order(matrix, wavelength):
     return np.argmin(np.abs(matrix[:, 0] - wavelength.to(u.Angstrom).value))
 
 
-def matrix_row_to_spectrum(matrix, closest_order):
+def order_n_pixels(matrix):
+    """
+    Return the number of wavelength samples in each spectral order.
+
+    Use this to size the buffers passed to `matrix_row_to_spectrum`, for
+    example ``np.empty(order_n_pixels(matrix).max())``.
+
+    Parameters
+    ----------
+    matrix : `~np.ndarray`
+        Matrix of blaze function curves from the archive.
+
+    Returns
+    -------
+    n_pixels : `~np.ndarray`
+        Integer number of wavelength samples in each order.
+    """
+    return np.rint(matrix[:, 2]).astype(int)
+
+
+@lru_cache()
+def _pixel_offsets(n_pixels, dtype):
+    """
+    Offsets of each pixel from the central pixel of an order, in pixels.
+    """
+    offsets = np.arange(n_pixels, dtype=dtype) - n_pixels / 2
+    offsets.flags.writeable = False
+    return offsets
+
+
+def matrix_row_to_spectrum(matrix, closest_order, out=None, dtype=np.float64):
     """
     Given a ``matrix`` from the archive and a spectral order index
     ``closest_order``, return the spectrum (wavelength and flux).
@@ -111,6 +171,16 @@ def matrix_row_to_spectrum(matrix, closest_order):
         Matrix of blaze function curves from the archive.
     closest_order : int
         Closest spectral order to wavelength ``wavelength``.
+    out : None or tuple of `~np.ndarray`
+        Buffers ``(wave, flux)`` to write the spectrum into, each with at least
+        as many elements as there are pixels in the order (see
+        `order_n_pixels`). The returned spectrum is a view on the first
+        elements of the buffers. By default, new arrays are allocated.
+    dtype : `~numpy.dtype`
+        Precision of the returned wavelengths and fluxes, if ``out`` is None.
+        The polynomial is evaluated in the precision of the output, so
+        ``np.float32`` trades some accuracy in the faint wings of each order
+        for half of the memory.
 
     Returns
     -------
@@ -121,10 +191,91 @@ def matrix_row_to_spectrum(matrix, closest_order):
     """
     lam_0, delta_lam, n_lam = matrix[closest_order][:3]
     polynomial_coeffs = matrix[closest_order][3:]
-    wave = np.arange(lam_0 - n_lam*delta_lam/2, lam_0 + n_lam*delta_lam/2,
-                     delta_lam)
-    flux = np.polyval(polynomial_coeffs, wave-lam_0)
-    return wave * u.Angstrom, flux
+    n_pixels = int(np.rint(n_lam))
+
+    if out is None:
+        wave = np.empty(n_pixels, dtype=dtype)
+        flux = np.empty(n_pixels, dtype=dtype)
+    else:
+        wave, flux = out
+        if len(wave) < n_pixels or len(flux) < n_pixels:
+            raise ValueError("The `out` buffers must have at least {0} "
+                             "elements for order {1}."
+                             .format(n_pixels, closest_order))
+        wave = wave[:n_pixels]
+        flux = flux[:n_pixels]
+
+    # Evaluate the polynomial with Horner's method in place, using ``wave`` to
+    # hold the offsets from the central wavelength
+    np.multiply(_pixel_offsets(n_pixels, wave.dtype), delta_lam, out=wave)
+    flux[:] = polynomial_coeffs[0]
+    for coeff in polynomial_coeffs[1:]:
+        flux *= wave
+        flux += coeff
+    wave += lam_0
+    return wave << u.Angstrom, flux
+
+
+def pixel_count_rates(matrix, orders, wavelengths):
+    """
+    Return the count rates at the pixels closest to ``wavelengths`` in the
+    spectral orders ``orders``, as in `sn_to_exp_time`.
+
+    Parameters
+    ----------
+    matrix : `~np.ndarray`
+        Matrix of blaze function curves from the archive.
+    orders : `~np.ndarray`
+        Spectral order indices, broadcastable against ``wavelengths``.
+    wavelengths : `~np.ndarray`
+        Wavelengths in Angstroms.
+
+    Returns
+    -------
+    count_rates : `~np.ndarray`
+        Counts per second at the closest pixel of each order. Wavelengths
+        beyond the ends of the order get the count rate of the outermost pixel.
+    covered : `~np.ndarray`
+        True where the order covers the wavelength.
+    """
+    lam_0, delta_lam = matrix[orders, 0], matrix[orders, 1]
+    n_pixels = order_n_pixels(matrix)[orders]
+
+    # Wavelengths on the edge of an order are covered by its outermost pixels
+    pixel = np.rint((wavelengths - lam_0) / delta_lam + n_pixels / 2)
+    covered = (pixel >= 0) & (pixel <= n_pixels - 1)
+    x = delta_lam * (np.clip(pixel, 0, n_pixels - 1) - n_pixels / 2)
+
+    count_rates = np.zeros(x.shape)
+    for coeff in np.moveaxis(matrix[orders, 3:], -1, 0):
+        count_rates *= x
+        count_rates += coeff
+    return count_rates, covered
+
+
+def line_count_rates(matrix, wavelengths):
+    """
+    Return the count rate at each wavelength in every order covering it.
+
+    Parameters
+    ----------
+    matrix : `~np.ndarray`
+        Matrix of blaze function curves from the archive.
+    wavelengths : `~astropy.units.Quantity`
+        Wavelengths with shape ``(n_lines,)``.
+
+    Returns
+    -------
+    count_rates : `~np.ndarray`
+        Counts per second with shape ``(n_lines, n_orders)``, NaN where the
+        order doesn't cover the wavelength.
+    """
+    count_rates, covered = pixel_count_rates(
+        matrix, np.arange(len(matrix)),
+        wavelengths.to(u.Angstrom).value[:, np.newaxis]
+    )
+    count_rates[~covered] = np.nan
+    return count_rates
 
 
 def scale_flux(dataset, V):
@@ -173,7 +324,7 @@ def sn_to_exp_time(wave, flux, wavelength, signal_to_noise):
 
 @u.quantity_input(exp_time=u.s, wavelength=u.Angstrom)
 def reconstruct_order(sptype, wavelength, V, exp_time=None,
-                      signal_to_noise=None):
+                      signal_to_noise=None, out=None, dtype=np.float64):
     """
     Return the counts as a function of wavelength for the spectral
     order nearest to ``wavelength`` for a star of spectral type ``sptype`` and
@@ -201,6 +352,11 @@ def reconstruct_order(sptype, wavelength, V, exp_time=None,
         to generate the counts curve that has S/N = ``signal_to_noise`` at
         wavelength ``wavelength``. Otherwise, generate counts curve for
         exposure time ``exp_time``.
+    out : None or tuple of `~np.ndarray`
+        Buffers ``(wave, flux)`` to reuse for the spectrum, see
+        `matrix_row_to_spectrum`.
+    dtype : `~numpy.dtype`
+        Precision of the returned wavelengths and fluxes, if ``out`` is None.
 
     Returns
     -------
@@ -214,10 +370,11 @@ def reconstruct_order(sptype, wavelength, V, exp_time=None,
 
     target, closest_spectral_type = closest_target(sptype)
 
-    matrix = archive[target][:]
+    matrix = load_template(target)
 
     closest_order = get_closest_order(matrix, wavelength)
-    wave, flux = matrix_row_to_spectrum(matrix, closest_order)
+    wave, flux = matrix_row_to_spectrum(matrix, closest_order, out=out,
+                                        dtype=dtype)
     flux *= scale_flux(archive[target], V)
 
     if exp_time is not None and signal_to_noise is None:
@@ -279,7 +436,7 @@ def signal_to_noise_to_exp_time(sptype, wavelength, V, signal_to_noise):
     """
     target, closest_spectral_type = closest_target(sptype)
 
-    matrix = archive[target][:]
+    matrix = load_template(target)
 
     closest_order = get_closest_order(matrix, wavelength)
     wave, flux = matrix_row_to_spectrum(matrix, closest_order)
@@ -287,3 +444,182 @@ def signal_to_noise_to_exp_time(sptype, wavelength, V, signal_to_noise):
 
     exp_time = sn_to_exp_time(wave, flux, wavelength, signal_to_noise)
     return exp_time
+
+
+def _samples(value, shape, name):
+    """
+    Return samples of ``value`` along the last axis, for targets of shape
+    ``shape``.
+    """
+    samples = np.asarray(getattr(value, 'distribution', value), dtype=float)
+    if samples.ndim == 0:
+        return samples[np.newaxis]
+    if not hasattr(value, 'distribution') and samples.shape == shape:
+        # One value per target, rather than samples
+        return samples[..., np.newaxis]
+    if samples.shape[:-1] == shape or (samples.shape[:-1] == () and
+                                       hasattr(value, 'distribution')):
+        return samples
+    raise ValueError("`{0}` has shape {1}, which doesn't match the {2} "
+                     "targets. Supply one value per target, or samples with "
+                     "shape (n_targets, n_samples)."
+                     .format(name, samples.shape, shape))
+
+
+@u.quantity_input(wavelength=u.Angstrom)
+def exp_time_percentiles(sptype, wavelength, V, signal_to_noise, throughput=1,
+                         percentiles=(16, 50, 84)):
+    """
+    Compute percentiles of the exposure time required to collect
+    signal-to-noise ratio ``signal_to_noise`` at wavelength ``wavelength``,
+    given samples from the distributions of the V magnitude ``V`` and the
+    relative throughput ``throughput``.
+
+    The exposure time scales as ``signal_to_noise**2 / (count rate)``, so each
+    target is reconstructed once and the samples are propagated in a single
+    vectorized step. Use ``throughput`` to also describe the uncertainty in how
+    well the closest spectral type in the archive matches the target.
+
+    Several targets can be computed at once by passing a list of spectral
+    types, in which case ``wavelength`` and ``signal_to_noise`` may be arrays
+    with one element per target. ``V`` and ``throughput`` may then be a
+    single value, one value per target, samples with shape
+    ``(n_targets, n_samples)``, or a `~astropy.uncertainty.Distribution`
+    shared by every target.
+
+    .. warning ::
+        ``arcesetc`` doesn't know anything about saturation. Ye be warned!
+
+    Parameters
+    ----------
+    sptype : str or list of str
+        Spectral type of each star.
+    wavelength : `~astropy.units.Quantity`
+        Wavelength of interest.
+    V : float, `~np.ndarray` or `~astropy.uncertainty.Distribution`
+        V magnitude of the target, or samples from its distribution along the
+        last axis.
+    signal_to_noise : float or `~np.ndarray`
+        Desired signal-to-noise.
+    throughput : float, `~np.ndarray` or `~astropy.uncertainty.Distribution`
+        Throughput relative to the archived observations, or samples from its
+        distribution along the last axis.
+    percentiles : sequence of float
+        Percentiles of the exposure time distribution to return.
+
+    Returns
+    -------
+    exp_time : `~astropy.units.Quantity`
+        Exposure time percentiles, with the percentiles along the last axis.
+
+    Examples
+    --------
+
+    What's the median exposure time and 90% interval for a V=12 +/- 0.1 mag
+    M0V star, with a throughput uncertainty of 10%?
+
+    >>> import numpy as np
+    >>> import astropy.units as u
+    >>> from astropy.uncertainty import normal
+    >>> from arcesetc import exp_time_percentiles
+    >>> V = normal(12, std=0.1, n_samples=10000)
+    >>> throughput = normal(1, std=0.1, n_samples=10000)
+    >>> exp_time_percentiles('M0V', 6562 * u.Angstrom, V, 30, throughput,
+    ...                      percentiles=[5, 50, 95])  # doctest: +SKIP
+    <Quantity [520.1, 644.6, 809.6] s>
+    """
+    sptype, wavelength, signal_to_noise = np.broadcast_arrays(
+        np.asarray(sptype, dtype=object), wavelength.to(u.Angstrom).value,
+        signal_to_noise
+    )
+    V = _samples(V, sptype.shape, 'V')
+    throughput = _samples(throughput, sptype.shape, 'throughput')
+
+    # Exposure time to reach S/N = 1 for each target if it had V = 0
+    unit_exp_time = np.empty(sptype.shape)
+    for index in np.ndindex(sptype.shape):
+        unit_exp_time[index] = signal_to_noise_to_exp_time(
+            sptype[index], wavelength[index] * u.Angstrom, 0, 1
+        ).to(u.s).value
+
+    # Broadcast the samples along the last axis against the targets
+    exp_time = ((signal_to_noise**2 * unit_exp_time)[..., np.newaxis] *
+                10**(0.4 * V) / throughput)
+    exp_time = np.moveaxis(np.percentile(exp_time, percentiles, axis=-1),
+                           0, -1)
+    return exp_time * u.s
+
+
+@u.quantity_input(wavelengths=u.Angstrom)
+def line_list_exp_time(sptype, wavelengths, V, signal_to_noise):
+    """
+    Compute the exposure time required to collect signal-to-noise ratio
+    ``signal_to_noise`` at every wavelength in a line list, for a star of
+    spectral type ``sptype`` and V magnitude ``V``.
+
+    Each line is measured in the order with the highest count rate among the
+    orders covering it, including orders that overlap at their edges. The
+    exposure time of the observation is set by the line which requires the
+    longest exposure.
+
+    .. warning ::
+        ``arcesetc`` doesn't know anything about saturation. Ye be warned!
+
+    Parameters
+    ----------
+    sptype : str
+        Spectral type of the star.
+    wavelengths : `~astropy.units.Quantity`
+        Wavelengths of the lines, for example the ``wavelength`` column of a
+        `~astropy.table.QTable`.
+    V : float
+        V magnitude of the target.
+    signal_to_noise : float or `~np.ndarray`
+        Desired signal-to-noise at every line, or at each line.
+
+    Returns
+    -------
+    exp_time : `~astropy.units.Quantity`
+        Exposure time required to reach ``signal_to_noise`` at every line.
+    lines : `~astropy.table.QTable`
+        For each line, the wavelength, the desired S/N, the index of the order
+        used, the count rate in that order and the exposure time required
+        to reach the desired S/N at that line.
+
+    Examples
+    --------
+
+    How long must one expose on a V=12 mag M0V star to get a S/N of 30 at
+    H-alpha and both lines of the sodium doublet?
+
+    >>> import astropy.units as u
+    >>> from arcesetc import line_list_exp_time
+    >>> wavelengths = [6562.8, 5889.95, 5895.92] * u.Angstrom
+    >>> exp_time, lines = line_list_exp_time('M0V', wavelengths, 12, 30)
+    >>> print(exp_time) # doctest: +FLOAT_CMP
+    2100.8525029028 s
+    """
+    from astropy.table import QTable
+
+    target, closest_spectral_type = closest_target(sptype)
+    matrix = load_template(target)
+
+    wavelengths = np.atleast_1d(wavelengths)
+    signal_to_noise = np.broadcast_to(signal_to_noise, wavelengths.shape)
+
+    count_rates = line_count_rates(matrix, wavelengths)
+    uncovered = np.all(np.isnan(count_rates), axis=1)
+    if np.any(uncovered):
+        raise ValueError("No spectral order covers the wavelengths: {0}"
+                         .format(wavelengths[uncovered]))
+
+    orders = np.nanargmax(count_rates, axis=1)
+    count_rate = (count_rates[np.arange(len(orders)), orders] *
+                  scale_flux(archive[target], V))
+    exp_times = signal_to_noise**2 / count_rate * u.s
+
+    lines = QTable([wavelengths, signal_to_noise, orders,
+                    count_rate / u.s, exp_times],
+                   names=['wavelength', 'signal_to_noise', 'order',
+                          'count_rate', 'exp_time'])
+    return exp_times.max(), lines
@@ -0,0 +1,183 @@
+import os
+import warnings
+from time import perf_counter
+
+import numpy as np
+import astropy.units as u
+from astropy.io import fits
+from astropy.table import Table
+
+from .util import (closest_target, get_closest_order, load_template,
+                   order_n_pixels, reconstruct_order)
+
+__all__ = ['validate_orders']
+
+directory = os.path.dirname(__file__)
+
+# Reduced ARCES frames bundled in ``arcesetc/data``, with the spectral type
+# and V magnitude used to reconstruct them from the archive
+bundled_frames = {
+    'HR5191.0002.wfrmcpc.fits': ('B3V', 1.86),
+    'BD28_4211.0026.wfrmcpc.fits': ('sdO2VIIIHe5', 10.58),
+    'HIP107864.0003.wfrmcpc.fits': ('sdO2VIIIHe5', 10.58),
+}
+
+
+def read_frame(path):
+    """
+    Read every order of a reduced ARCES frame.
+
+    Parameters
+    ----------
+    path : str
+        Path to the reduced FITS frame.
+
+    Returns
+    -------
+    wave : `~astropy.units.Quantity`
+        Wavelengths with shape ``(n_orders, n_pixels)``.
+    flux : `~np.ndarray`
+        Counts with shape ``(n_orders, n_pixels)``.
+    exp_time : `~astropy.units.Quantity`
+        Exposure time of the frame.
+    """
+    # Imported here so that specutils is only needed to run the validation
+    from specutils import SpectrumCollection
+
+    with warnings.catch_warnings():
+        # The frames don't record a flux unit, specutils assumes ADU
+        warnings.simplefilter('ignore', UserWarning)
+        spectra = SpectrumCollection.read(path)
+    exp_time = fits.getheader(path)['EXPTIME'] * u.s
+    return (u.Quantity(spectra.wavelength).to(u.Angstrom),
+            np.asarray(spectra.flux.value), exp_time)
+
+
+def interpolate_orders(x, xp, fp, n_pixels):
+    """
+    Linearly interpolate many orders at once.
+
+    Parameters
+    ----------
+    x : `~np.ndarray`
+        Wavelengths at which to interpolate, with shape ``(n_rows, n)``.
+    xp : `~np.ndarray`
+        Increasing wavelength grid of each row, with shape
+        ``(n_rows, max_pixels)``. Only the first ``n_pixels`` are used.
+    fp : `~np.ndarray`
+        Fluxes on the grid ``xp``.
+    n_pixels : `~np.ndarray`
+        Number of valid pixels in each row.
+
+    Returns
+    -------
+    f : `~np.ndarray`
+        Interpolated fluxes, with the shape of ``x``.
+    in_order : `~np.ndarray`
+        True where ``x`` falls within the grid of its row.
+    """
+    rows = np.arange(len(x))[:, np.newaxis]
+    first = xp[:, :1]
+    last = xp[rows, n_pixels[:, np.newaxis] - 1]
+    in_order = (x >= first) & (x <= last)
+
+    # The grids are uniform, so find the pixel left of each wavelength directly
+    delta = (last - first) / (n_pixels[:, np.newaxis] - 1)
+    left = np.clip(np.floor((x - first) / delta).astype(int), 0,
+                   n_pixels[:, np.newaxis] - 2)
+    x_left, x_right = xp[rows, left], xp[rows, left + 1]
+    weight = (x - x_left) / (x_right - x_left)
+    f = (1 - weight) * fp[rows, left] + weight * fp[rows, left + 1]
+    return f, in_order
+
+
+def validate_orders(frames=None, dtype=np.float64, atol=500, rtol=0.1):
+    """
+    Compare reconstructed counts to every order of the reduced ARCES frames.
+
+    Each order of each frame is reconstructed with
+    `~arcesetc.reconstruct_order`, exactly as users call it, writing into
+    preallocated buffers. The reconstructions are then interpolated onto the
+    observed wavelengths of every order at once. Pixels outside of the
+    wavelength range of the reconstructed order are ignored.
+
+    Parameters
+    ----------
+    frames : dict or None
+        Mapping of FITS file paths to ``(sptype, V)`` tuples. By default,
+        validate against all of the frames bundled in ``arcesetc/data``.
+    dtype : `~numpy.dtype`
+        Precision of the reconstructed spectra.
+    atol : float
+        Absolute tolerance on the residuals, in counts.
+    rtol : float
+        Relative tolerance on the residuals.
+
+    Returns
+    -------
+    table : `~astropy.table.Table`
+        One row per order per frame, with the median, median absolute and
+        maximum absolute residuals (observed minus reconstructed counts), the
+        median fractional residual (relative to the reconstructed counts), and
+        the fraction of pixels with residuals within
+        ``atol + rtol * abs(reconstructed)``. Statistics of orders without any
+        pixels in the reconstructed order are NaN. The total run time in
+        seconds is stored in ``table.meta['runtime']``.
+    """
+    if frames is None:
+        frames = {os.path.join(directory, 'data', name): properties
+                  for name, properties in bundled_frames.items()}
+
+    start = perf_counter()
+    columns = []
+    for path, (sptype, V) in frames.items():
+        wave, observed, exp_time = read_frame(path)
+        target, closest_spectral_type = closest_target(sptype)
+        matrix = load_template(target)
+
+        max_pixels = order_n_pixels(matrix).max()
+        model_wave = np.empty((len(wave), max_pixels), dtype=dtype)
+        model_flux = np.empty((len(wave), max_pixels), dtype=dtype)
+        orders = np.empty(len(wave), dtype=int)
+        for i, order_wave in enumerate(wave):
+            mean_wavelength = order_wave.mean()
+            orders[i] = get_closest_order(matrix, mean_wavelength)
+            reconstruct_order(sptype, mean_wavelength, V, exp_time=exp_time,
+                              out=(model_wave[i], model_flux[i]))
+        n_pixels = order_n_pixels(matrix)[orders]
+
+        flux, in_order = interpolate_orders(wave.value, model_wave,
+                                            model_flux, n_pixels)
+
+        residuals = np.where(in_order, observed - flux, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractional = residuals / flux
+        within_tolerance = np.abs(residuals) <= atol + rtol * np.abs(flux)
+        n_in_order = in_order.sum(axis=1)
+
+        with warnings.catch_warnings(), np.errstate(invalid='ignore'):
+            # Orders without pixels in the reconstruction get NaN statistics
+            warnings.simplefilter('ignore', RuntimeWarning)
+            columns.append([
+                [os.path.basename(path)] * len(wave),
+                [closest_spectral_type] * len(wave),
+                np.arange(len(wave)), orders,
+                wave.value.mean(axis=1), n_in_order,
+                np.nanmedian(residuals, axis=1),
+                np.nanmedian(np.abs(residuals), axis=1),
+                np.nanmax(np.abs(residuals), axis=1),
+                np.nanmedian(np.abs(fractional), axis=1),
+                np.where(n_in_order > 0,
+                         within_tolerance.sum(axis=1) / n_in_order, np.nan)
+            ])
+
+    table = Table([np.concatenate(column) for column in zip(*columns)],
+                  names=['frame', 'sptype', 'order',
+                         'archive_order', 'wavelength', 'n_pixels',
+                         'median_residual', 'median_abs_residual',
+                         'max_abs_residual',
+                         'median_fractional_residual',
+                         'within_tolerance'])
+    table['wavelength'].unit = u.Angstrom
+    table.meta['runtime'] = perf_counter() - start
+    return table